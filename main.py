@@ -18,27 +18,38 @@ Hierarchy:
 * Function/Method → **leaf** with metrics
 
 Each leaf node contains static metadata such as its source, docstring, statement
-count, cyclomatic complexity, etc.  The program is dependency-free (stdlib only)
-and built with Python ≥3.12 in mind.  It is structured as a reusable core API
-plus a thin CLI wrapper.  Optional duplication metrics and tiny progress bars
-are available via command line flags.
+count, cyclomatic complexity, etc.  The program is dependency-free (stdlib only;
+``rapidfuzz`` speeds up the duplication metrics if installed) and built with
+Python ≥3.12 in mind.  It is structured as a reusable core API plus a thin CLI
+wrapper.  Optional duplication metrics and tiny progress bars are available via
+command line flags.
 """
 
 from __future__ import annotations
 
 import argparse
 import ast
-import hashlib
+import bisect
+import functools
 import io
 import json
 import os
 import re
 import tokenize
 import sys
+import zlib
+from collections import Counter, defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field, asdict
 from difflib import SequenceMatcher
+from itertools import chain
 from pathlib import Path
-from typing import Any, Iterable, MutableMapping, Sequence
+from typing import Any, ClassVar, Iterable, Iterator, MutableMapping, Sequence
+
+try:  # optional C++ accelerated similarity, falls back to difflib
+    from rapidfuzz.fuzz import ratio as _rf_ratio  # type: ignore[import-not-found]
+except ImportError:  # pragma: no cover – depends on the environment
+    _rf_ratio = None  # type: ignore[assignment]
 
 
 def _print_progress(current: int, total: int, prefix: str = "") -> None:
@@ -57,48 +68,74 @@ def _print_progress(current: int, total: int, prefix: str = "") -> None:
 ####################
 
 _W = 5  # n-gram width  (5-token shingles)
-_K = 50  # how many hashes we keep (winnowing window size)
+_K = 8  # winnowing window size (in shingles), one fingerprint kept per window
 _MIN_TOKS = 25  # minimum tokens for consideration for code duplication
 _JACCARD_MIN = 0.3  # minimum IoU for similarity computation, optimization
+_HASH_MASK = 0xFFFFFFFFFFFFFFFF  # keep shingle hashes as unsigned 64-bit ints
+
 
+@functools.cache
+def _token_id(label: str) -> int:
+    """Stable integer id of a token label.
 
-def _token_fingerprint(source: str) -> set[str]:
+    Unlike ``hash(str)``, tuples of these ids hash the same in every
+    interpreter (no PYTHONHASHSEED randomisation).
     """
-    Return a small, order-insensitive *fingerprint set* for the given
-    source code string.  Two similar functions share many fingerprints.
+    return zlib.crc32(label.encode())
+
+
+_NUM_TOKEN = _token_id("0")  # all numbers look the same, so "42" ~ "99"
+_STR_TOKEN = _token_id("STR")  # all string literals look the same
+
 
-    Algorithm: tokenise → normalise → slide a W-token window →
-    hash the window → keep K smallest hashes (winnowing).
+def _token_fingerprint(toks: Sequence[int]) -> frozenset[int]:
     """
-    toks: list[str] = []
-    for tok in tokenize.generate_tokens(io.StringIO(source).readline):
-        # Skip indentation / newlines / comments
-        if tok.type in (
-            tokenize.INDENT,
-            tokenize.DEDENT,
-            tokenize.NEWLINE,
-            tokenize.NL,
-            tokenize.COMMENT,
-        ):
-            continue
-        s = tok.string
-        # Canonicalise literals so "42" and "99" look the same
-        if tok.type == tokenize.NUMBER:
-            s = "0"
-        elif tok.type == tokenize.STRING:
-            s = "STR"
-        toks.append(s)
+    Return a small, order-insensitive *fingerprint set* for the given
+    token stream (see `_MetricVisitor.tokens`).  Two similar functions share
+    many fingerprints.
 
+    Algorithm: slide a W-token window → hash the window → slide a K-shingle
+    window over the hashes and keep the minimum of each (winnowing,
+    Schleimer et al. 2003).  Any match of at least W + K - 1 tokens is thus
+    guaranteed to share a fingerprint.
+    """
     if len(toks) < _MIN_TOKS:
-        return set()
+        return frozenset()
 
     # make shingles
-    hashes: list[str] = []
-    for i in range(len(toks) - _W + 1):
-        window = " ".join(toks[i : i + _W])
-        hashes.append(hashlib.md5(window.encode()).hexdigest())
-
-    return set(sorted(hashes)[:_K])
+    hashes = [
+        hash(tuple(toks[i : i + _W])) & _HASH_MASK for i in range(len(toks) - _W + 1)
+    ]
+    window = min(_K, len(hashes))
+
+    # winnowing: monotonic deque of indices whose hashes increase front to back,
+    # so the front is always the (rightmost) minimum of the current window
+    fingerprints: set[int] = set()
+    candidates: deque[int] = deque()
+    last = -1
+    for i, h in enumerate(hashes):
+        while candidates and hashes[candidates[-1]] >= h:
+            candidates.pop()
+        candidates.append(i)
+        if candidates[0] <= i - window:
+            candidates.popleft()
+        if i >= window - 1 and candidates[0] != last:
+            last = candidates[0]
+            fingerprints.add(hashes[last])
+    return frozenset(fingerprints)
+
+
+def _similarity(a: str, b: str) -> float:
+    """Return the similarity ratio of two source strings in ``[0, 1]``.
+
+    Uses ``rapidfuzz`` when installed, otherwise ``difflib.SequenceMatcher``.
+    Both compute 2·M/T, but rapidfuzz counts M as the exact longest common
+    subsequence instead of difflib's greedy matching blocks, so its scores can
+    be somewhat higher.  It is also orders of magnitude faster.
+    """
+    if _rf_ratio is not None:
+        return _rf_ratio(a, b) / 100.0
+    return SequenceMatcher(None, a, b).ratio()
 
 
 _TODO_RE = re.compile(r"\b(?:TODO|FIXME|XXX)\b", re.IGNORECASE)
@@ -106,6 +143,9 @@ _TODO_RE = re.compile(r"\b(?:TODO|FIXME|XXX)\b", re.IGNORECASE)
 
 def _count_todo_comments(source: str) -> int:
     """Return how many TODO-like comments appear in the source."""
+    # most functions have no TODO at all: skip the (slow) tokenize pass then
+    if not _TODO_RE.search(source):
+        return 0
     count = 0
     for tok in tokenize.generate_tokens(io.StringIO(source).readline):
         if tok.type == tokenize.COMMENT and _TODO_RE.search(tok.string):
@@ -113,10 +153,35 @@ def _count_todo_comments(source: str) -> int:
     return count
 
 
+_PAIR_BATCH = 256  # candidate pairs scored per work item
+
+# sources of all leaves, set once per worker process by _init_pair_worker
+_worker_sources: list[str] = []
+
+
+def _score_pairs(
+    pairs: Sequence[tuple[int, int]], sources: Sequence[str]
+) -> list[float]:
+    """Return the similarity of ``sources[i]`` and ``sources[j]`` for each pair."""
+    return [_similarity(sources[i], sources[j]) for i, j in pairs]
+
+
+def _init_pair_worker(sources: list[str]) -> None:
+    global _worker_sources
+    _worker_sources = sources
+
+
+def _score_pairs_worker(pairs: Sequence[tuple[int, int]]) -> list[float]:
+    return _score_pairs(pairs, _worker_sources)
+
+
 def compute_duplication(
-    all_files: Iterable[CodeNode], *, show_progress: bool = False
+    all_files: Iterable[CodeNode], *, show_progress: bool = False, jobs: int = 1
 ) -> None:
-    """Mutates each CodeNode(metrics) in-place, adding a 'duplication' entry."""
+    """Mutates each CodeNode(metrics) in-place, adding a 'duplication' entry.
+
+    With ``jobs > 1`` the candidate pairs are scored in worker processes.
+    """
     # flatten to a list of leaf nodes
     leaves: list[CodeNode] = []
 
@@ -130,47 +195,88 @@ def compute_duplication(
     for f in all_files:
         _walk(f)
 
-    # pre-compute fingerprints for speed
-    fps = [getattr(n, "_fingerprint") for n in leaves]
+    # only leaves with a fingerprint can match; keep their data in flat,
+    # parallel lists (one per attribute) so the loops below only index lists
+    leaves = [n for n in leaves if n._fingerprint]
+    fps = [n._fingerprint for n in leaves]
+    sizes = [len(fp) for fp in fps]
+    sources = [n.source for n in leaves]
+    names = [n.qualname or n.name for n in leaves]
+    lines = [n.metrics.lines if n.metrics else 0 for n in leaves]
+
+    # visit the leaves by fingerprint size: since min(|A|, |B|) / max(|A|, |B|)
+    # bounds the Jaccard index from above, each leaf only needs to be compared
+    # with the following ones up to size |A| / _JACCARD_MIN
+    by_size = sorted(range(len(leaves)), key=sizes.__getitem__)
+    ranked_sizes = [sizes[i] for i in by_size]
+
+    # inverted index: fingerprint hash -> size ranks of the leaves containing
+    # it, so that only pairs sharing at least one fingerprint are considered
+    postings: defaultdict[int, list[int]] = defaultdict(list)
+    for rank, i in enumerate(by_size):
+        for h in fps[i]:
+            postings[h].append(rank)
+
+    # cheap Jaccard gate: collect the likely matches
+    pairs: list[tuple[int, int]] = []
+    for rank, i in enumerate(by_size):
+        size_i = ranked_sizes[rank]
+        # slightly generous bound against rounding, the exact check follows
+        end = bisect.bisect_right(
+            ranked_sizes, size_i / _JACCARD_MIN * (1 + 1e-9), lo=rank + 1
+        )
+        if end == rank + 1:
+            continue
+        # |fps[i] & fps[j]| for every such leaf j sharing a fingerprint; the
+        # postings are sorted, so those leaves are a slice counted in C
+        shared = Counter(
+            chain.from_iterable(
+                ranks[bisect.bisect_right(ranks, rank) : bisect.bisect_left(ranks, end)]
+                for ranks in map(postings.__getitem__, fps[i])
+            )
+        )
+        for other, inter in shared.items():
+            if inter / (size_i + ranked_sizes[other] - inter) >= _JACCARD_MIN:
+                j = by_size[other]
+                pairs.append((i, j) if i < j else (j, i))
+    pairs.sort()  # deterministic (i, j) order, ties in the scores below rely on it
+
+    # expensive similarity only on likely matches
+    batches = [pairs[k : k + _PAIR_BATCH] for k in range(0, len(pairs), _PAIR_BATCH)]
+    ratios: list[float] = []
+    if jobs > 1 and len(batches) > 1:
+        with ProcessPoolExecutor(
+            max_workers=jobs, initializer=_init_pair_worker, initargs=(sources,)
+        ) as ex:
+            for idx, batch_ratios in enumerate(ex.map(_score_pairs_worker, batches), 1):
+                ratios.extend(batch_ratios)
+                if show_progress:
+                    _print_progress(idx, len(batches), prefix="duplication")
+    else:
+        for idx, batch in enumerate(batches, 1):
+            ratios.extend(_score_pairs(batch, sources))
+            if show_progress:
+                _print_progress(idx, len(batches), prefix="duplication")
 
     best_ratio = [0.0] * len(leaves)
     best_idx = [-1] * len(leaves)
-
-    # naive O(n²) outer loop but with a cheap Jaccard gate
-    for i in range(len(leaves)):
-        if show_progress:
-            _print_progress(i + 1, len(leaves), prefix="duplication")
-        for j in range(i + 1, len(leaves)):
-            if not fps[i] or not fps[j]:
-                continue
-
-            inter = len(fps[i] & fps[j])
-            union = len(fps[i] | fps[j])
-            jacc = inter / union if union else 0.0
-            if jacc < _JACCARD_MIN:
-                continue
-            # expensive difflib only on likely matches
-            seq_matcher = SequenceMatcher(None, leaves[i].source, leaves[j].source)
-            ratio = seq_matcher.ratio()
-            if ratio > best_ratio[i]:
-                best_ratio[i], best_idx[i] = ratio, j
-            if ratio > best_ratio[j]:
-                best_ratio[j], best_idx[j] = ratio, i
+    for (i, j), ratio in zip(pairs, ratios):
+        if ratio > best_ratio[i]:
+            best_ratio[i], best_idx[i] = ratio, j
+        if ratio > best_ratio[j]:
+            best_ratio[j], best_idx[j] = ratio, i
 
     # write the result back into metrics
-    if show_progress:
-        _print_progress(len(leaves), len(leaves), prefix="duplication")
-
     for idx, node in enumerate(leaves):
         if best_idx[idx] == -1:
             continue
 
-        other = leaves[best_idx[idx]]
+        other = best_idx[idx]
         assert node.metrics, "at this point, node.metrics has to exist"
         node.metrics.duplication = Duplication(
             score=round(best_ratio[idx], 3),
-            other=other.qualname or other.name,
-            lines_other=other.metrics.lines if other.metrics else 0,
+            other=names[other],
+            lines_other=lines[other],
         )
 
 
@@ -224,30 +330,29 @@ class CodeNode:
     metrics: Metrics | None = None
     source: str = ""
     children: list["CodeNode"] = field(default_factory=list)
-    _fingerprint: set[str] = field(
-        default_factory=set, repr=False, compare=False, metadata={"serialize": False}
+    _fingerprint: frozenset[int] = field(
+        default_factory=frozenset,
+        repr=False,
+        compare=False,
+        metadata={"serialize": False},
     )
 
-    def _clean(self, d):
-        if isinstance(d, (int, float, str, type(None))):
-            return d
-
-        if isinstance(d, (tuple, list)):
-            return [self._clean(i) for i in d]
-
-        if isinstance(d, CodeNode):
-            return d.to_dict()
-
-        if isinstance(d, dict):
-            return {k: self._clean(v) for k, v in d.items() if not k.startswith("_")}
-
-        raise TypeError(f"Unknown type {type(d)}")
-
     def to_dict(self) -> dict[str, Any]:
         """Recursively turn the node (and children) into plain JSON-safe data."""
-        raw = asdict(self)
-        cleaned = self._clean(raw)
-        return cleaned
+        # built field by field: `asdict` would deep-copy the whole subtree only
+        # to have the private `_fingerprint` stripped again afterwards
+        return {
+            "name": self.name,
+            "nodetype": self.nodetype,
+            "path": self.path,
+            "qualname": self.qualname,
+            "lineno": self.lineno,
+            "end_lineno": self.end_lineno,
+            "docstring": self.docstring,
+            "metrics": asdict(self.metrics) if self.metrics else None,
+            "source": self.source,
+            "children": [c.to_dict() for c in self.children],
+        }
 
     @property
     def is_directory(self) -> bool:  # noqa: D401 – simple property
@@ -266,54 +371,121 @@ class CodeNode:
 class _MetricVisitor(ast.NodeVisitor):
     """Collect basic metrics for complexity & size (no external deps)."""
 
-    STMTS = (
-        ast.If,
-        ast.For,
-        ast.While,
-        ast.AsyncFor,
-        ast.With,
-        ast.AsyncWith,
-        ast.Try,
-        ast.FunctionDef,
-        ast.AsyncFunctionDef,
-        ast.ClassDef,
-        ast.ExceptHandler,
-        ast.Match,
-        ast.Assign,
-        ast.AugAssign,
-        ast.AnnAssign,
-        ast.Raise,
-        ast.Return,
+    STMTS = frozenset(
+        {
+            ast.If,
+            ast.For,
+            ast.While,
+            ast.AsyncFor,
+            ast.With,
+            ast.AsyncWith,
+            ast.Try,
+            ast.FunctionDef,
+            ast.AsyncFunctionDef,
+            ast.ClassDef,
+            ast.ExceptHandler,
+            ast.Match,
+            ast.Assign,
+            ast.AugAssign,
+            ast.AnnAssign,
+            ast.Raise,
+            ast.Return,
+        }
     )
-    DECISIONS = (
-        ast.If,
-        ast.For,
-        ast.While,
-        ast.AsyncFor,
-        ast.Try,
-        ast.ExceptHandler,
-        ast.With,
-        ast.AsyncWith,
-        ast.Match,
-        ast.BoolOp,
+    DECISIONS = frozenset(
+        {
+            ast.If,
+            ast.For,
+            ast.While,
+            ast.AsyncFor,
+            ast.Try,
+            ast.ExceptHandler,
+            ast.With,
+            ast.AsyncWith,
+            ast.Match,
+            ast.BoolOp,
+        }
     )
 
+    # bit flags per node type: statement | decision | Expr statement | expression
+    _STMT, _DECISION, _EXPR_STMT, _EXPR = 1, 2, 4, 8
+    _DEFS = frozenset({ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef})
+    # (flags, token id or -1 for no token) per node type, see _type_info
+    _TYPE_INFO: ClassVar[dict[type, tuple[int, int]]] = {}
+
     def __init__(self) -> None:
         self.stmt_count = 0
         self.expr_count = 0
         self.top_expr_stmts = 0
         self.decision_points = 0
+        # normalised token stream in source order, for duplication fingerprints
+        self.tokens: list[int] = []
+
+    @classmethod
+    def _type_info(cls, node_type: type) -> tuple[int, int]:
+        """Compute (and cache) the metric flags and token of an AST node type."""
+        # AST node classes are not subclassed, so membership is exact; only
+        # the abstract `ast.expr` base needs a subclass check
+        flags = (
+            (cls._STMT if node_type in cls.STMTS else 0)
+            | (cls._DECISION if node_type in cls.DECISIONS else 0)
+            | (cls._EXPR_STMT if node_type is ast.Expr else 0)
+            | (cls._EXPR if issubclass(node_type, ast.expr) else 0)
+        )
+        if issubclass(node_type, ast.expr_context):
+            token = -1  # Load/Store/Del contexts carry no information of their own
+        else:
+            token = _token_id(node_type.__name__)
+        info = (flags, token)
+        cls._TYPE_INFO[node_type] = info
+        return info
 
     def generic_visit(self, node: ast.AST) -> None:
-        if isinstance(node, self.STMTS):
-            self.stmt_count += 1
-        if isinstance(node, self.DECISIONS):
-            self.decision_points += 1
-        if isinstance(node, ast.Expr):
-            self.top_expr_stmts += 1
-        if isinstance(node, ast.expr):
-            self.expr_count += 1
-        super().generic_visit(node)
+        # iterate the whole subtree depth-first with an explicit stack instead
+        # of recursing through `visit` (no per-node method dispatch); children
+        # are pushed in reverse so tokens come out in source order
+        type_info = self._TYPE_INFO
+        tokens = self.tokens
+        stmts = decisions = expr_stmts = exprs = 0
+        stack: list[Any] = [node]
+        while stack:
+            child = stack.pop()
+            node_type = type(child)
+            info = type_info.get(node_type)
+            if info is None:
+                info = self._type_info(node_type)
+            flags, token = info
+            if flags:
+                stmts += flags & 1
+                decisions += (flags >> 1) & 1
+                expr_stmts += (flags >> 2) & 1
+                exprs += (flags >> 3) & 1
+            if token >= 0:
+                tokens.append(token)
+                # identifiers are kept, literals are canonicalised
+                if node_type is ast.Name:
+                    tokens.append(_token_id(child.id))
+                elif node_type is ast.Attribute:
+                    tokens.append(_token_id(child.attr))
+                elif node_type is ast.arg or node_type is ast.keyword:
+                    tokens.append(_token_id(child.arg or "**"))
+                elif node_type in self._DEFS:
+                    tokens.append(_token_id(child.name))
+                elif node_type is ast.Constant:
+                    value = child.value
+                    if isinstance(value, (str, bytes)):
+                        tokens.append(_STR_TOKEN)
+                    elif isinstance(value, (int, float, complex)) and not isinstance(
+                        value, bool
+                    ):
+                        tokens.append(_NUM_TOKEN)
+                    else:  # True / False / None / ...
+                        tokens.append(_token_id(repr(value)))
+            stack.extend(reversed(list(ast.iter_child_nodes(child))))
+        self.stmt_count += stmts
+        self.decision_points += decisions
+        self.top_expr_stmts += expr_stmts
+        self.expr_count += exprs
 
     @property
     def cyclomatic_complexity(self) -> int:  # noqa: D401 – simple property
@@ -332,7 +504,8 @@ class _MetricVisitor(ast.NodeVisitor):
 
 def _analyse_function(
     func: ast.FunctionDef | ast.AsyncFunctionDef,
-    source_lines: Sequence[str],
+    source: str,
+    line_offsets: Sequence[int],
     file_path: Path,
     kind: str = "function",
     parent: str | None = None,
@@ -344,9 +517,11 @@ def _analyse_function(
 
     start, end = func.lineno, func.end_lineno  # Python 3.8+
     end = end if end is not None else start + 1
-    text = "".join(source_lines[start - 1 : end])
+    text = source[
+        line_offsets[start - 1] : line_offsets[end] if end < len(line_offsets) else None
+    ]
     todo_count = _count_todo_comments(text)
-    fp = _token_fingerprint(text)
+    fp = _token_fingerprint(visitor.tokens)
     total_args = (
         len(func.args.args)
         + len(func.args.posonlyargs)
@@ -396,7 +571,8 @@ def _analyse_function(
 
 def _analyse_class(
     cls: ast.ClassDef,
-    source_lines: Sequence[str],
+    source: str,
+    line_offsets: Sequence[int],
     file_path: Path,
 ) -> CodeNode:
     """Return a `CodeNode` for a class plus its *method* children."""
@@ -407,7 +583,12 @@ def _analyse_class(
             # Ignore *nested* functions inside methods – they'll be included in metrics only
             children.append(
                 _analyse_function(
-                    item, source_lines, file_path, kind="method", parent=cls.name
+                    item,
+                    source,
+                    line_offsets,
+                    file_path,
+                    kind="method",
+                    parent=cls.name,
                 )
             )
 
@@ -425,16 +606,33 @@ def _analyse_class(
 def analyse_file(task: FileTask) -> CodeNode:
     """Analyse a Python source file, returning its *file* `CodeNode`."""
 
-    text = task.path.read_text(encoding="utf-8", errors="replace")
-    tree = ast.parse(text, filename=str(task.path))
-    lines = text.splitlines(keepends=True)
+    data = task.path.read_bytes()
+    try:
+        encoding, _ = tokenize.detect_encoding(io.BytesIO(data).readline)
+    except SyntaxError:  # unknown / invalid coding cookie
+        encoding = "utf-8"
+    # universal newlines, as `read_text` did: the line offsets below and the
+    # reported sources rely on "\n" being the only line ending
+    text = (
+        data.decode(encoding, errors="replace")
+        .replace("\r\n", "\n")
+        .replace("\r", "\n")
+    )
+    try:
+        # parse the raw bytes: the parser honours BOMs & PEP 263 coding cookies
+        tree = ast.parse(data, filename=str(task.path))
+    except SyntaxError:
+        # e.g. undecodable bytes: retry on the lossy text (re-raises real errors)
+        tree = ast.parse(text, filename=str(task.path))
+    # start offset of every line, to slice function sources out of `text`
+    line_offsets = [0] + [m.end() for m in re.finditer("\n", text)]
 
     children: list[CodeNode] = []
     for node in tree.body:  # Only *top-level* defs
         if isinstance(node, ast.ClassDef):
-            children.append(_analyse_class(node, lines, task.path))
+            children.append(_analyse_class(node, text, line_offsets, task.path))
         elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
-            children.append(_analyse_function(node, lines, task.path))
+            children.append(_analyse_function(node, text, line_offsets, task.path))
         # Nested functions are skipped as requested
 
     return CodeNode(
@@ -538,23 +736,47 @@ def gather_tasks(
             for ignored_dir in ignore_dirs
         )
 
+    def _walk(directory: str) -> Iterator[Path]:
+        """Yield the `.py` files below *directory*, in `os.walk` order.
+
+        `os.scandir` gets the entry types from the directory listing itself,
+        so no extra stat calls are needed per file.  Symlinks are skipped and
+        *directory* is already resolved, so the yielded paths are as well.
+        """
+        files: list[Path] = []
+        subdirs: list[str] = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    # like `os.walk`, entries we cannot stat are no directories
+                    try:
+                        if entry.is_symlink():
+                            continue
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    if is_dir:
+                        if not _is_ignored(Path(entry.path)):  # prune ignored dirs
+                            subdirs.append(entry.path)
+                    elif entry.name.endswith(".py") and entry.is_file():
+                        files.append(Path(entry.path))
+        except OSError:
+            return  # unreadable directory: skip it silently, as `os.walk` does
+        yield from files
+        for subdir in subdirs:
+            yield from _walk(subdir)
+
     for raw in paths:
         p = Path(raw).resolve()
         if p in seen or _is_ignored(p):
             continue  # avoid duplicates or ignored entries
         if p.is_dir():
-            for root, dirs, files in os.walk(p):
-                root_p = Path(root)
-                # prune ignored directories
-                dirs[:] = [d for d in dirs if not _is_ignored((root_p / d).resolve())]
-                for fname in files:
-                    if not fname.endswith(".py"):
-                        continue
-                    f = (root_p / fname).resolve()
-                    if f.is_symlink() or _is_ignored(f) or f in seen:
-                        continue
-                    tasks.append(FileTask(f))
-                    seen.add(f)
+            for f in _walk(str(p)):
+                # ignored directories are pruned, only ignored files remain
+                if f in ignore_files or f in seen:
+                    continue
+                tasks.append(FileTask(f))
+                seen.add(f)
         elif p.is_file() and p.suffix == ".py" and not _is_ignored(p):
             tasks.append(FileTask(p))
             seen.add(p)
@@ -571,6 +793,17 @@ def gather_tasks(
 #######
 
 
+def _positive_int(value: str) -> int:
+    """argparse type for integers >= 1."""
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"expected a positive integer, got {value!r}")
+    return number
+
+
 def _parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         prog="check_code",
@@ -610,6 +843,13 @@ def _parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
             "Repeat the flag to provide multiple entries."
         ),
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=_positive_int,
+        default=os.cpu_count() or 1,
+        help="Number of worker processes for the analysis (default: all CPUs).",
+    )
     return parser.parse_args(argv)
 
 
@@ -627,19 +867,27 @@ def main(argv: Sequence[str] | None = None) -> None:  # noqa: N802 – main styl
 
     print(f"Analysing {len(tasks)} files…", file=sys.stderr)
     file_nodes: list[CodeNode] = []
-    for idx, t in enumerate(tasks, 1):
-        file_nodes.append(analyse_file(t))
-        _print_progress(idx, len(tasks), prefix="analyse")
+    if args.jobs > 1 and len(tasks) > 1:
+        # files are independent, so analyse them in worker processes
+        with ProcessPoolExecutor(max_workers=args.jobs) as ex:
+            chunksize = max(1, min(8, len(tasks) // (4 * args.jobs)))
+            results = ex.map(analyse_file, tasks, chunksize=chunksize)
+            for idx, fnode in enumerate(results, 1):
+                file_nodes.append(fnode)
+                _print_progress(idx, len(tasks), prefix="analyse")
+    else:
+        for idx, t in enumerate(tasks, 1):
+            file_nodes.append(analyse_file(t))
+            _print_progress(idx, len(tasks), prefix="analyse")
 
     if args.duplication:
-        compute_duplication(file_nodes, show_progress=True)
+        compute_duplication(file_nodes, show_progress=True, jobs=args.jobs)
     tree = prune_tree(build_tree(file_nodes))
 
     output_path = Path(args.output)
-    output_path.write_text(
-        json.dumps(tree.to_dict(), indent=2, ensure_ascii=False),
-        encoding="utf-8",
-    )
+    # stream to disk instead of materialising the whole JSON string first
+    with output_path.open("w", encoding="utf-8") as fh:
+        json.dump(tree.to_dict(), fh, indent=2, ensure_ascii=False)
     print(f"→ JSON written to {output_path}")
 
 